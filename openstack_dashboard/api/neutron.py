@@ -21,9 +21,11 @@
 
 from __future__ import absolute_import
 
+import hashlib
 import logging
 
 from django.conf import settings  # noqa
+from django.core.cache import cache  # noqa
 from django.utils.datastructures import SortedDict  # noqa
 from django.utils.translation import ugettext_lazy as _  # noqa
 
@@ -708,6 +710,22 @@ def router_remove_gateway(request, router_id):
     neutronclient(request).remove_gateway_router(router_id)
 
 
+def tenant_floating_ip_count(request):
+    # Only the IDs are needed to count, so skip the port lookup done by
+    # FloatingIpManager.list() and ask Neutron for a narrow projection.
+    tenant_id = request.user.tenant_id
+    fips = neutronclient(request).list_floatingips(tenant_id=tenant_id,
+                                                   fields=['id'])
+    return len(fips.get('floatingips'))
+
+
+def tenant_security_group_count(request):
+    tenant_id = request.user.tenant_id
+    secgroups = neutronclient(request).list_security_groups(
+        tenant_id=tenant_id, fields=['id'])
+    return len(secgroups.get('security_groups'))
+
+
 def tenant_quota_get(request, tenant_id):
     return base.QuotaSet(neutronclient(request).show_quota(tenant_id)['quota'])
 
@@ -727,13 +745,32 @@ def provider_list(request):
     return providers['service_providers']
 
 
+def _extensions_cache_key(request):
+    # Tokens can be too long for a memcached key, so hash them together
+    # with the endpoint the extensions were listed from.
+    key = "%s:%s" % (base.url_for(request, 'network'), request.user.token.id)
+    return "neutron_extensions:%s" % hashlib.md5(key).hexdigest()
+
+
 @memoized
 def list_extensions(request):
+    # The extensions of an endpoint do not change during a session, so
+    # share the listing between the requests made with the same token.
+    timeout = getattr(settings, 'NEUTRON_EXTENSIONS_CACHE_TIMEOUT', 0)
+    if timeout:
+        cache_key = _extensions_cache_key(request)
+        extensions = cache.get(cache_key)
+        if extensions is not None:
+            return extensions
+
     extensions_list = neutronclient(request).list_extensions()
     if 'extensions' in extensions_list:
-        return extensions_list['extensions']
+        extensions = extensions_list['extensions']
     else:
-        return {}
+        extensions = {}
+    if timeout:
+        cache.set(cache_key, extensions, timeout)
+    return extensions
 
 
 @memoized
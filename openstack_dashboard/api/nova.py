@@ -32,6 +32,7 @@ from novaclient.v1_1.contrib import list_extensions as nova_list_extensions
 from novaclient.v1_1 import security_group_rules as nova_rules
 from novaclient.v1_1 import security_groups as nova_security_groups
 from novaclient.v1_1 import servers as nova_servers
+from novaclient.v1_1 import usage as nova_usage
 
 from horizon import conf
 from horizon.utils.memoized import memoized  # noqa
@@ -103,6 +104,15 @@ class NovaUsage(base.APIResourceWrapper):
              'total_local_gb_usage', 'total_memory_mb_usage',
              'total_vcpus_usage', 'total_hours']
 
+    @classmethod
+    def from_info(cls, info):
+        """Rebuilds a usage from the data returned by :meth:`get_info`."""
+        return cls(nova_usage.Usage(None, info, loaded=True))
+
+    def get_info(self):
+        """Returns the raw API data, which (unlike the resource) pickles."""
+        return self._apiresource._info
+
     def get_summary(self):
         return {'instances': self.total_active_instances,
                 'memory_mb': self.memory_mb,
@@ -14,12 +14,15 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from django.core.cache import cache  # noqa
 from django.core.urlresolvers import reverse  # noqa
 from django import http
+from django.test.utils import override_settings  # noqa
 from mox import IsA  # noqa
 
 from openstack_dashboard import api
 from openstack_dashboard.test import helpers as test
+from openstack_dashboard.usage import base as usage_base
 from openstack_dashboard.usage import quotas
 
 INDEX_URL = reverse('horizon:admin:defaults:index')
@@ -104,6 +107,7 @@ class UpdateDefaultQuotasTests(test.BaseAdminViewTests):
     @test.create_stubs({api.nova: ('default_quota_update', ),
                         api.cinder: ('default_quota_update', ),
                         quotas: ('get_default_quota_data', )})
+    @override_settings(USAGE_LIMITS_CACHE_TIMEOUT=60)
     def test_update_default_quotas(self):
         quota = self.quotas.first()
 
@@ -129,8 +133,14 @@ class UpdateDefaultQuotasTests(test.BaseAdminViewTests):
 
         self.mox.ReplayAll()
 
+        # The usage limits cached for every project are dropped on update.
+        cache.set(usage_base._limits_cache_key(self.tenant.id),
+                  self.limits['absolute'], 60)
+
         url = reverse('horizon:admin:defaults:update_defaults')
         res = self.client.post(url, updated_quota)
 
         self.assertNoFormErrors(res)
         self.assertRedirectsNoFollow(res, INDEX_URL)
+        self.assertIsNone(
+            cache.get(usage_base._limits_cache_key(self.tenant.id)))
@@ -24,6 +24,7 @@ from horizon import workflows
 from openstack_dashboard.api import base
 from openstack_dashboard.api import cinder
 from openstack_dashboard.api import nova
+from openstack_dashboard import usage
 from openstack_dashboard.usage import quotas
 
 ALL_NOVA_QUOTA_FIELDS = quotas.NOVA_QUOTA_FIELDS + quotas.MISSING_QUOTA_FIELDS
@@ -98,4 +99,6 @@ class UpdateDefaultQuotas(workflows.Workflow):
                 cinder.default_quota_update(request, **cinder_data)
         except Exception:
             exceptions.handle(request, _('Unable to update default quotas.'))
+        finally:
+            usage.invalidate_default_limits_cache()
         return True
@@ -40,9 +40,9 @@ class UsageViewTests(test.BaseAdminViewTests):
 
     @test.create_stubs({api.nova: ('usage_list', 'tenant_absolute_limits', ),
                         api.keystone: ('tenant_list',),
-                        api.neutron: ('is_extension_supported',),
-                        api.network: ('tenant_floating_ip_list',
-                                      'security_group_list')})
+                        api.neutron: ('is_extension_supported',
+                                      'tenant_floating_ip_count',
+                                      'tenant_security_group_count')})
     def test_usage(self):
         now = timezone.now()
         usage_obj = api.nova.NovaUsage(self.usages.first())
@@ -60,10 +60,10 @@ class UsageViewTests(test.BaseAdminViewTests):
             .AndReturn(self.limits['absolute'])
         api.neutron.is_extension_supported(IsA(http.HttpRequest),
                                            'security-group').AndReturn(True)
-        api.network.tenant_floating_ip_list(IsA(http.HttpRequest)) \
-                           .AndReturn(self.floating_ips.list())
-        api.network.security_group_list(IsA(http.HttpRequest)) \
-                           .AndReturn(self.q_secgroups.list())
+        api.neutron.tenant_floating_ip_count(IsA(http.HttpRequest)) \
+                           .AndReturn(len(self.floating_ips.list()))
+        api.neutron.tenant_security_group_count(IsA(http.HttpRequest)) \
+                           .AndReturn(len(self.q_secgroups.list()))
         self.mox.ReplayAll()
 
         res = self.client.get(reverse('horizon:admin:overview:index'))
@@ -85,9 +85,9 @@ class UsageViewTests(test.BaseAdminViewTests):
 
     @test.create_stubs({api.nova: ('usage_list', 'tenant_absolute_limits', ),
                         api.keystone: ('tenant_list',),
-                        api.neutron: ('is_extension_supported',),
-                        api.network: ('tenant_floating_ip_list',
-                                      'security_group_list')})
+                        api.neutron: ('is_extension_supported',
+                                      'tenant_floating_ip_count',
+                                      'tenant_security_group_count')})
     def test_usage_csv(self):
         now = timezone.now()
         usage_obj = [api.nova.NovaUsage(u) for u in self.usages.list()]
@@ -105,22 +105,28 @@ class UsageViewTests(test.BaseAdminViewTests):
             .AndReturn(self.limits['absolute'])
         api.neutron.is_extension_supported(IsA(http.HttpRequest),
                                            'security-group').AndReturn(True)
-        api.network.tenant_floating_ip_list(IsA(http.HttpRequest)) \
-                           .AndReturn(self.floating_ips.list())
-        api.network.security_group_list(IsA(http.HttpRequest)) \
-                           .AndReturn(self.q_secgroups.list())
+        api.neutron.tenant_floating_ip_count(IsA(http.HttpRequest)) \
+                           .AndReturn(len(self.floating_ips.list()))
+        api.neutron.tenant_security_group_count(IsA(http.HttpRequest)) \
+                           .AndReturn(len(self.q_secgroups.list()))
         self.mox.ReplayAll()
 
         csv_url = reverse('horizon:admin:overview:index') + "?format=csv"
         res = self.client.get(csv_url)
         self.assertTemplateUsed(res, 'admin/overview/usage.csv')
         self.assertTrue(isinstance(res.context['usage'], usage.GlobalUsage))
+        self.assertEqual(res.status_code, 200)
+        # The export is streamed, so read its content only once.
+        if getattr(res, 'streaming', False):
+            content = ''.join(res.streaming_content)
+        else:
+            content = res.content
         hdr = 'Project Name,VCPUs,Ram (MB),Disk (GB),Usage (Hours)'
-        self.assertContains(res, '%s\r\n' % (hdr))
+        self.assertIn('%s\r\n' % (hdr), content)
         for obj in usage_obj:
             row = u'{0},{1},{2},{3},{4:.2f}\r\n'.format(obj.project_name,
                                                         obj.vcpus,
                                                         obj.memory_mb,
                                                         obj.disk_gb_hours,
                                                         obj.vcpu_hours)
-        self.assertContains(res, row)
+        self.assertIn(row, content.decode('utf-8'))
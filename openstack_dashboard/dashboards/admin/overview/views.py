@@ -29,7 +29,7 @@ from openstack_dashboard import usage
 from openstack_dashboard.usage import base
 
 
-class GlobalUsageCsvRenderer(base.BaseCsvResponse):
+class GlobalUsageCsvRenderer(base.BaseCsvStreamingResponse):
 
     columns = [_("Project Name"), _("VCPUs"), _("Ram (MB)"),
                _("Disk (GB)"), _("Usage (Hours)")]
@@ -16,6 +16,7 @@
 
 import logging
 
+from django.core.cache import cache  # noqa
 from django.core.urlresolvers import reverse  # noqa
 from django import http
 from django.test.utils import override_settings  # noqa
@@ -27,6 +28,7 @@ from horizon.workflows import views
 
 from openstack_dashboard import api
 from openstack_dashboard.test import helpers as test
+from openstack_dashboard.usage import base as usage_base
 from openstack_dashboard.usage import quotas
 
 from openstack_dashboard.dashboards.admin.projects import workflows
@@ -765,6 +767,7 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
                         api.nova: ('tenant_quota_update',),
                         api.cinder: ('tenant_quota_update',),
                         quotas: ('get_tenant_quota_data',)})
+    @override_settings(USAGE_LIMITS_CACHE_TIMEOUT=60)
     def test_update_project_save(self):
         project = self.tenants.first()
         quota = self.quotas.first()
@@ -938,6 +941,9 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
                         "enabled": project.enabled}
         workflow_data.update(project_data)
         workflow_data.update(updated_quota)
+        # The usage limits cached for the project are dropped on update.
+        cache_key = usage_base._limits_cache_key(project.id)
+        cache.set(cache_key, self.limits['absolute'], 60)
         url = reverse('horizon:admin:projects:update',
                       args=[self.tenant.id])
         res = self.client.post(url, workflow_data)
@@ -945,6 +951,7 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
         self.assertNoFormErrors(res)
         self.assertMessageCount(error=0, warning=1)
         self.assertRedirectsNoFollow(res, INDEX_URL)
+        self.assertIsNone(cache.get(cache_key))
 
     @test.create_stubs({api.neutron: ('is_extension_supported',
                                       'tenant_quota_get',
@@ -33,6 +33,7 @@ from openstack_dashboard.api import base
 from openstack_dashboard.api import cinder
 from openstack_dashboard.api import keystone
 from openstack_dashboard.api import nova
+from openstack_dashboard import usage
 from openstack_dashboard.usage import quotas
 
 INDEX_URL = "horizon:admin:projects:index"
@@ -728,3 +729,5 @@ class UpdateProject(workflows.Workflow):
                                          'members, but unable to modify '
                                          'project quotas.'))
             return True
+        finally:
+            usage.invalidate_limits_cache(project_id)
@@ -24,10 +24,12 @@ from django.core.urlresolvers import reverse  # noqa
 from django import http
 from django.test.utils import override_settings  # noqa
 from django.utils import timezone
+from django.utils import translation
 
 from mox import IsA  # noqa
 
 from openstack_dashboard import api
+from openstack_dashboard.dashboards.project.overview import views
 from openstack_dashboard.test import helpers as test
 from openstack_dashboard import usage
 
@@ -38,17 +40,18 @@ INDEX_URL = reverse('horizon:project:overview:index')
 class UsageViewTests(test.TestCase):
     def _stub_neutron_api_calls(self, neutron_sg_enabled=True):
         self.mox.StubOutWithMock(api.neutron, 'is_extension_supported')
-        self.mox.StubOutWithMock(api.network, 'tenant_floating_ip_list')
+        self.mox.StubOutWithMock(api.neutron, 'tenant_floating_ip_count')
         if neutron_sg_enabled:
-            self.mox.StubOutWithMock(api.network, 'security_group_list')
+            self.mox.StubOutWithMock(api.neutron,
+                                     'tenant_security_group_count')
         api.neutron.is_extension_supported(
             IsA(http.HttpRequest),
             'security-group').AndReturn(neutron_sg_enabled)
-        api.network.tenant_floating_ip_list(IsA(http.HttpRequest)) \
-                           .AndReturn(self.floating_ips.list())
+        api.neutron.tenant_floating_ip_count(IsA(http.HttpRequest)) \
+                           .AndReturn(len(self.floating_ips.list()))
         if neutron_sg_enabled:
-            api.network.security_group_list(IsA(http.HttpRequest)) \
-                .AndReturn(self.q_secgroups.list())
+            api.neutron.tenant_security_group_count(IsA(http.HttpRequest)) \
+                .AndReturn(len(self.q_secgroups.list()))
 
     def test_usage(self):
         now = timezone.now()
@@ -144,6 +147,54 @@ class UsageViewTests(test.TestCase):
                               "?format=csv")
         self.assertTemplateUsed(res, 'project/overview/usage.csv')
         self.assertTrue(isinstance(res.context['usage'], usage.ProjectUsage))
+        self.assertEqual(res.status_code, 200)
+        # The export is streamed, so read its content only once.
+        if getattr(res, 'streaming', False):
+            content = ''.join(res.streaming_content)
+        else:
+            content = res.content
+        content = content.decode('utf-8')
+        hdr = ('Instance Name,VCPUs,Ram (MB),Disk (GB),Usage (Hours),'
+               'Uptime(Seconds),State')
+        self.assertIn('%s\r\n' % (hdr), content)
+        for inst in usage_obj.server_usages:
+            row = u'{0},{1},{2},{3},{4:.2f},{5},{6}\r\n'.format(
+                inst['name'],
+                inst['vcpus'],
+                inst['memory_mb'],
+                inst['local_gb'],
+                inst['hours'],
+                inst['uptime'],
+                inst['state'].capitalize())
+            self.assertIn(row, content)
+
+    def test_usage_csv_translated(self):
+        now = timezone.now()
+        usage_obj = api.nova.NovaUsage(self.usages.first())
+        self.mox.StubOutWithMock(api.nova, 'usage_get')
+        self.mox.StubOutWithMock(api.nova, 'tenant_absolute_limits')
+        start = datetime.datetime(now.year, now.month, now.day, 0, 0, 0, 0)
+        end = datetime.datetime(now.year, now.month, now.day, 23, 59, 59, 0)
+        api.nova.usage_get(IsA(http.HttpRequest),
+                           self.tenant.id,
+                           start, end).AndReturn(usage_obj)
+        api.nova.tenant_absolute_limits(IsA(http.HttpRequest))\
+            .AndReturn(self.limits['absolute'])
+        self._stub_neutron_api_calls()
+        self.mox.ReplayAll()
+        res = self.client.get(reverse('horizon:project:overview:index') +
+                              "?format=csv", HTTP_ACCEPT_LANGUAGE='ja')
+        self.assertEqual(res.status_code, 200)
+        if getattr(res, 'streaming', False):
+            content = ''.join(res.streaming_content)
+        else:
+            content = res.content
+        content = content.decode('utf-8')
+        with translation.override('ja'):
+            hdr = u','.join(unicode(column) for column
+                            in views.ProjectUsageCsvRenderer.columns)
+        self.assertNotIn(u'Instance Name', hdr)
+        self.assertIn(u'%s\r\n' % (hdr), content)
 
     def test_usage_exception_usage(self):
         now = timezone.now()
@@ -201,6 +252,56 @@ class UsageViewTests(test.TestCase):
         self.assertTemplateUsed(res, 'project/overview/usage.html')
         self.assertTrue(isinstance(res.context['usage'], usage.ProjectUsage))
 
+    @override_settings(USAGE_LIMITS_CACHE_TIMEOUT=60)
+    def test_usage_limits_cached(self):
+        now = timezone.now()
+        usage_obj = api.nova.NovaUsage(self.usages.first())
+        self.mox.StubOutWithMock(api.nova, 'usage_get')
+        self.mox.StubOutWithMock(api.nova, 'tenant_absolute_limits')
+        start = datetime.datetime(now.year, now.month, now.day, 0, 0, 0, 0)
+        end = datetime.datetime(now.year, now.month, now.day, 23, 59, 59, 0)
+        api.nova.usage_get(IsA(http.HttpRequest),
+                           self.tenant.id,
+                           start, end).MultipleTimes().AndReturn(usage_obj)
+        api.nova.tenant_absolute_limits(IsA(http.HttpRequest))\
+            .AndReturn(self.limits['absolute'])
+        self._stub_neutron_api_calls()
+        self.mox.ReplayAll()
+
+        # The second page load is served from the limits cache.
+        for i in range(2):
+            res = self.client.get(reverse('horizon:project:overview:index'))
+            self.assertTemplateUsed(res, 'project/overview/usage.html')
+            limits = res.context['usage'].limits
+            self.assertEqual(limits['maxTotalFloatingIps'], float("inf"))
+
+    @override_settings(USAGE_CACHE_TIMEOUT=300,
+                       USAGE_LIMITS_CACHE_TIMEOUT=60)
+    def test_usage_cached(self):
+        now = timezone.now()
+        usage_obj = api.nova.NovaUsage(self.usages.first())
+        self.mox.StubOutWithMock(api.nova, 'usage_get')
+        self.mox.StubOutWithMock(api.nova, 'tenant_absolute_limits')
+        start = datetime.datetime(now.year, now.month, now.day, 0, 0, 0, 0)
+        end = datetime.datetime(now.year, now.month, now.day, 23, 59, 59, 0)
+        api.nova.usage_get(IsA(http.HttpRequest),
+                           self.tenant.id,
+                           start, end).AndReturn(usage_obj)
+        api.nova.tenant_absolute_limits(IsA(http.HttpRequest))\
+            .AndReturn(self.limits['absolute'])
+        self._stub_neutron_api_calls()
+        self.mox.ReplayAll()
+
+        # The second page load is served from the usage cache.
+        for i in range(2):
+            res = self.client.get(reverse('horizon:project:overview:index'))
+            self.assertTemplateUsed(res, 'project/overview/usage.html')
+            usages = res.context['usage']
+            self.assertEqual(len(usages.get_instances()),
+                             len(usage_obj.server_usages))
+            self.assertEqual(usages.summary['vcpu_hours'],
+                             usage_obj.vcpu_hours)
+
     @override_settings(OPENSTACK_NEUTRON_NETWORK={'enable_quotas': True})
     def test_usage_with_neutron(self):
         self._test_usage_with_neutron(neutron_sg_enabled=True)
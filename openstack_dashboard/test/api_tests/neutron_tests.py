@@ -14,6 +14,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import copy
+
+from django.test.utils import override_settings  # noqa
+
 from openstack_dashboard import api
 from openstack_dashboard.test import helpers as test
 
@@ -271,6 +275,31 @@ class NeutronApiTests(test.APITestCase):
         api.neutron.router_remove_interface(
             self.request, router_id, port_id=fake_port)
 
+    def test_tenant_floating_ip_count(self):
+        fips = {'floatingips': [{'id': fip['id']} for fip
+                                in self.api_q_floating_ips.list()]}
+
+        neutronclient = self.stub_neutronclient()
+        neutronclient.list_floatingips(tenant_id=self.request.user.tenant_id,
+                                       fields=['id']).AndReturn(fips)
+        self.mox.ReplayAll()
+
+        ret_val = api.neutron.tenant_floating_ip_count(self.request)
+        self.assertEqual(len(self.api_q_floating_ips.list()), ret_val)
+
+    def test_tenant_security_group_count(self):
+        secgroups = {'security_groups': [{'id': sg['id']} for sg
+                                         in self.api_q_secgroups.list()]}
+
+        neutronclient = self.stub_neutronclient()
+        neutronclient.list_security_groups(
+            tenant_id=self.request.user.tenant_id,
+            fields=['id']).AndReturn(secgroups)
+        self.mox.ReplayAll()
+
+        ret_val = api.neutron.tenant_security_group_count(self.request)
+        self.assertEqual(len(self.api_q_secgroups.list()), ret_val)
+
     def test_is_extension_supported(self):
         neutronclient = self.stub_neutronclient()
         neutronclient.list_extensions().MultipleTimes() \
@@ -281,3 +310,16 @@ class NeutronApiTests(test.APITestCase):
             api.neutron.is_extension_supported(self.request, 'quotas'))
         self.assertFalse(
             api.neutron.is_extension_supported(self.request, 'doesntexist'))
+
+    @override_settings(NEUTRON_EXTENSIONS_CACHE_TIMEOUT=300)
+    def test_list_extensions_cached_per_token(self):
+        neutronclient = self.stub_neutronclient()
+        neutronclient.list_extensions() \
+            .AndReturn({'extensions': self.api_extensions.list()})
+        self.mox.ReplayAll()
+
+        api.neutron.list_extensions(self.request)
+        # Another request with the same token is served from the cache.
+        other_request = copy.copy(self.request)
+        ret_val = api.neutron.list_extensions(other_request)
+        self.assertEqual(self.api_extensions.list(), ret_val)
@@ -24,6 +24,7 @@ import os
 from django.conf import settings  # noqa
 from django.contrib.auth.middleware import AuthenticationMiddleware  # noqa
 from django.contrib.messages.storage import default_storage  # noqa
+from django.core.cache import cache  # noqa
 from django.core.handlers import wsgi
 from django import http
 from django.test.client import RequestFactory  # noqa
@@ -122,6 +123,8 @@ class TestCase(horizon_helpers.TestCase):
     """
     def setUp(self):
         test_utils.load_test_data(self)
+        # Don't let API results cached by a previous test leak into this one.
+        cache.clear()
         self.mox = mox.Mox()
         self.factory = RequestFactoryWithMessages()
         self.context = {'authorized_tenants': self.tenants.list()}
@@ -16,6 +16,9 @@
 
 from openstack_dashboard.usage.base import BaseUsage  # noqa
 from openstack_dashboard.usage.base import GlobalUsage  # noqa
+from openstack_dashboard.usage.base import \
+    invalidate_default_limits_cache  # noqa
+from openstack_dashboard.usage.base import invalidate_limits_cache  # noqa
 from openstack_dashboard.usage.base import ProjectUsage  # noqa
 from openstack_dashboard.usage.tables import BaseUsageTable  # noqa
 from openstack_dashboard.usage.tables import GlobalUsageTable  # noqa
@@ -25,6 +28,8 @@ from openstack_dashboard.usage.views import UsageView  # noqa
 assert BaseUsage
 assert ProjectUsage
 assert GlobalUsage
+assert invalidate_default_limits_cache
+assert invalidate_limits_cache
 assert UsageView
 assert BaseUsageTable
 assert ProjectUsageTable
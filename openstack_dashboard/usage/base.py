@@ -1,18 +1,33 @@
 from __future__ import division
 
-from csv import DictWriter  # noqa
 from csv import writer  # noqa
 
 import datetime
+from itertools import chain  # noqa
 import logging
-from StringIO import StringIO  # noqa
+import sys
+import threading
+import time
+
+try:
+    from cStringIO import StringIO  # noqa
+except ImportError:
+    from StringIO import StringIO  # noqa
 
 from django.conf import settings  # noqa
+from django.core.cache import cache  # noqa
 from django.http import HttpResponse  # noqa
 from django import template as django_template
 from django.utils import timezone
+from django.utils import translation
 from django.utils.translation import ugettext_lazy as _  # noqa
-from django import VERSION  # noqa
+
+try:
+    # Streaming responses are only available from Django 1.5 on.
+    from django.http import StreamingHttpResponse  # noqa
+    HAS_STREAMING = True
+except ImportError:
+    HAS_STREAMING = False
 
 from horizon import exceptions
 from horizon import forms
@@ -24,6 +39,106 @@ from openstack_dashboard.usage import quotas
 
 LOG = logging.getLogger(__name__)
 
+_INF = float("inf")
+
+_NEUTRON_USAGE_RESOURCE_MAP = {
+    'floatingip': {
+        'limit_name': 'totalFloatingIpsUsed',
+        'message': _('Unable to retrieve floating IP addresses.')
+    },
+    'security_group': {
+        'limit_name': 'totalSecurityGroupsUsed',
+        'message': _('Unable to retrieve security gruops.')
+    }
+}
+
+_NEUTRON_LIMIT_NAME_MAP = {
+    'floatingip': 'maxTotalFloatingIps',
+    'security_group': 'maxSecurityGroups',
+}
+
+_LIMITS_GENERATION_KEY = "usage_limits_generation"
+
+
+def _limits_cache_key(project_id):
+    # The generation changes whenever the default quotas are updated, which
+    # leaves the limits cached before that behind.
+    generation = cache.get(_LIMITS_GENERATION_KEY, "0")
+    return "usage_limits:%s:%s" % (generation, project_id)
+
+
+def _usage_cache_get(key):
+    return cache.get(key)
+
+
+def _usage_cache_set(key, value, timeout):
+    if timeout:
+        cache.set(key, value, timeout)
+
+
+def invalidate_limits_cache(project_id):
+    """Drops the cached limits of a project, e.g. after its quotas change."""
+    if getattr(settings, 'USAGE_LIMITS_CACHE_TIMEOUT', 0):
+        cache.delete(_limits_cache_key(project_id))
+
+
+def invalidate_default_limits_cache():
+    """Drops the cached limits of all projects, e.g. after a defaults edit."""
+    timeout = getattr(settings, 'USAGE_LIMITS_CACHE_TIMEOUT', 0)
+    if timeout:
+        # Entries of the previous generation expire within the timeout, so
+        # the generation only needs to outlive them.
+        cache.set(_LIMITS_GENERATION_KEY, "%f" % time.time(), timeout)
+
+
+def _cached_nova_usages(cache_key, fetch):
+    """Returns the ``NovaUsage`` list of ``fetch()``, cached if enabled.
+
+    The raw API data is cached rather than the novaclient resources, which
+    hold a reference to their client and cannot be pickled.
+    """
+    timeout = getattr(settings, 'USAGE_CACHE_TIMEOUT', 0)
+    if not timeout:
+        return fetch()
+    infos = _usage_cache_get(cache_key)
+    if infos is not None:
+        return [api.nova.NovaUsage.from_info(info) for info in infos]
+    usages = fetch()
+    _usage_cache_set(cache_key, [usage.get_info() for usage in usages],
+                     timeout)
+    return usages
+
+
+class _AsyncCall(threading.Thread):
+    """Runs ``func(*args, **kwargs)`` in a background thread.
+
+    Any exception raised by the call is kept and re-raised by
+    :meth:`result`, so errors can still be handled with
+    :func:`horizon.exceptions.handle` from the request thread.
+    """
+    def __init__(self, func, *args, **kwargs):
+        super(_AsyncCall, self).__init__()
+        self.daemon = True
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.value = None
+        self.exc_info = None
+        self.start()
+
+    def run(self):
+        try:
+            self.value = self.func(*self.args, **self.kwargs)
+        except Exception:
+            self.exc_info = sys.exc_info()
+
+    def result(self):
+        self.join()
+        if self.exc_info is not None:
+            exc_type, exc_value, exc_traceback = self.exc_info
+            raise exc_type, exc_value, exc_traceback
+        return self.value
+
 
 class BaseUsage(object):
     show_terminated = False
@@ -35,6 +150,11 @@ class BaseUsage(object):
         self.usage_list = []
         self.limits = {}
         self.quotas = {}
+        self._summarized = None
+        self._limits_loaded = False
+        self._neutron_limits_loaded = False
+        self._quotas_loaded = False
+        self._limits_complete = True
 
     @property
     def today(self):
@@ -42,21 +162,20 @@ class BaseUsage(object):
 
     @staticmethod
     def get_start(year, month, day):
-        start = datetime.datetime(year, month, day, 0, 0, 0)
-        return timezone.make_aware(start, timezone.utc)
+        return datetime.datetime(year, month, day, 0, 0, 0,
+                                 tzinfo=timezone.utc)
 
     @staticmethod
     def get_end(year, month, day):
-        end = datetime.datetime(year, month, day, 23, 59, 59)
-        return timezone.make_aware(end, timezone.utc)
+        return datetime.datetime(year, month, day, 23, 59, 59,
+                                 tzinfo=timezone.utc)
 
     def get_instances(self):
-        instance_list = []
-        [instance_list.extend(u.server_usages) for u in self.usage_list]
-        return instance_list
+        return list(chain.from_iterable(u.server_usages
+                                        for u in self.usage_list))
 
     def get_date_range(self):
-        if not hasattr(self, "start") or not hasattr(self, "end"):
+        if not hasattr(self, "_date_range"):
             args_start = args_end = (self.today.year,
                                      self.today.month,
                                      self.today.day)
@@ -74,9 +193,10 @@ class BaseUsage(object):
                 messages.error(self.request,
                                _("Invalid date format: "
                                  "Using today as default."))
-        self.start = self.get_start(*args_start)
-        self.end = self.get_end(*args_end)
-        return self.start, self.end
+            self.start = self.get_start(*args_start)
+            self.end = self.get_end(*args_end)
+            self._date_range = (self.start, self.end)
+        return self._date_range
 
     def init_form(self):
         today = datetime.date.today()
@@ -93,7 +213,7 @@ class BaseUsage(object):
 
     def get_form(self):
         if not hasattr(self, 'form'):
-            if any(key in ['start', 'end'] for key in self.request.GET):
+            if 'start' in self.request.GET or 'end' in self.request.GET:
                 # bound form
                 self.form = forms.DateForm(self.request.GET)
             else:
@@ -103,67 +223,74 @@ class BaseUsage(object):
                                                     'end': init[1]})
         return self.form
 
-    def _get_neutron_usage(self, limits, resource_name):
-        resource_map = {
-            'floatingip': {
-                'api': api.network.tenant_floating_ip_list,
-                'limit_name': 'totalFloatingIpsUsed',
-                'message': _('Unable to retrieve floating IP addresses.')
-            },
-            'security_group': {
-                'api': api.network.security_group_list,
-                'limit_name': 'totalSecurityGroupsUsed',
-                'message': _('Unable to retrieve security gruops.')
-            }
-        }
-
-        resource = resource_map[resource_name]
+    def _get_neutron_usage(self, call, resource_name):
+        resource = _NEUTRON_USAGE_RESOURCE_MAP[resource_name]
         try:
-            method = resource['api']
-            current_used = len(method(self.request))
+            current_used = call.result()
         except Exception:
             current_used = 0
             msg = resource['message']
-            exceptions.handle(self.request, msg)
+            self._handle_limits_error(msg)
 
-        limits[resource['limit_name']] = current_used
+        return resource['limit_name'], current_used
 
     def _set_neutron_limit(self, limits, neutron_quotas, resource_name):
-        limit_name_map = {
-            'floatingip': 'maxTotalFloatingIps',
-            'security_group': 'maxSecurityGroups',
-        }
         if neutron_quotas is None:
-            resource_max = float("inf")
+            resource_max = _INF
         else:
             resource_max = getattr(neutron_quotas.get(resource_name),
-                                   'limit', float("inf"))
+                                   'limit', _INF)
             if resource_max == -1:
-                resource_max = float("inf")
+                resource_max = _INF
+
+        limits[_NEUTRON_LIMIT_NAME_MAP[resource_name]] = resource_max
 
-        limits[limit_name_map[resource_name]] = resource_max
+    def _handle_limits_error(self, msg):
+        # Partial results are never stored in the limits cache.
+        self._limits_complete = False
+        exceptions.handle(self.request, msg)
 
     def get_neutron_limits(self):
+        if self._neutron_limits_loaded:
+            return
+        self._neutron_limits_loaded = True
+
         if not api.base.is_service_enabled(self.request, 'network'):
             return
 
+        # Both checks share one memoized extension listing, so run them
+        # before fanning out the calls that depend on them.
         neutron_sg_used = \
             api.neutron.is_security_group_extension_supported(self.request)
-
-        self._get_neutron_usage(self.limits, 'floatingip')
-        if neutron_sg_used:
-            self._get_neutron_usage(self.limits, 'security_group')
-
         # Quotas are an optional extension in Neutron. If it isn't
         # enabled, assume the floating IP limit is infinite.
-        if api.neutron.is_quotas_extension_supported(self.request):
+        neutron_quotas_used = \
+            api.neutron.is_quotas_extension_supported(self.request)
+
+        usage_calls = [('floatingip',
+                        _AsyncCall(api.neutron.tenant_floating_ip_count,
+                                   self.request))]
+        if neutron_sg_used:
+            usage_calls.append(('security_group',
+                                _AsyncCall(
+                                    api.neutron.tenant_security_group_count,
+                                    self.request)))
+        if neutron_quotas_used:
+            quota_call = _AsyncCall(api.neutron.tenant_quota_get,
+                                    self.request, self.project_id)
+
+        for resource_name, call in usage_calls:
+            limit_name, current_used = self._get_neutron_usage(call,
+                                                               resource_name)
+            self.limits[limit_name] = current_used
+
+        if neutron_quotas_used:
             try:
-                neutron_quotas = api.neutron.tenant_quota_get(self.request,
-                                                              self.project_id)
+                neutron_quotas = quota_call.result()
             except Exception:
                 neutron_quotas = None
                 msg = _('Unable to retrieve network quota information.')
-                exceptions.handle(self.request, msg)
+                self._handle_limits_error(msg)
         else:
             neutron_quotas = None
 
@@ -173,23 +300,60 @@ class BaseUsage(object):
                                     'security_group')
 
     def get_limits(self):
+        if self._limits_loaded:
+            return
+        self._limits_loaded = True
+
+        # Nova reports the limits of the token's project, so only those
+        # can be cached under the project ID.
+        cache_key = None
+        timeout = getattr(settings, 'USAGE_LIMITS_CACHE_TIMEOUT', 0)
+        if self.project_id != self.request.user.tenant_id:
+            timeout = 0
+        if timeout:
+            cache_key = _limits_cache_key(self.project_id)
+            limits = _usage_cache_get(cache_key)
+            if limits is not None:
+                self.limits = limits
+                return
+
+        # Nova limits are fetched in the background while the Neutron
+        # ones are gathered; the Neutron values take precedence.
+        nova_limits = _AsyncCall(api.nova.tenant_absolute_limits,
+                                 self.request)
+        self.get_neutron_limits()
         try:
-            self.limits = api.nova.tenant_absolute_limits(self.request)
+            limits = nova_limits.result()
         except Exception:
-            exceptions.handle(self.request,
-                              _("Unable to retrieve limit information."))
+            self._handle_limits_error(_("Unable to retrieve limit "
+                                        "information."))
+        else:
+            limits.update(self.limits)
+            self.limits = limits
 
-        self.get_neutron_limits()
+        if timeout and self._limits_complete:
+            _usage_cache_set(cache_key, self.limits, timeout)
 
     def get_usage_list(self, start, end):
         raise NotImplementedError("You must define a get_usage_list method.")
 
+    def _usage_cache_key(self, start, end):
+        return "usage:%s:%s:%s:%s" % (self.__class__.__name__,
+                                      self.project_id,
+                                      start.isoformat(),
+                                      end.isoformat())
+
     def summarize(self, start, end):
+        if self._summarized == (start, end):
+            return
+        self._summarized = (start, end)
+
         if start <= end and start <= self.today:
             # The API can't handle timezone aware datetime, so convert back
-            # to naive UTC just for this last step.
-            start = timezone.make_naive(start, timezone.utc)
-            end = timezone.make_naive(end, timezone.utc)
+            # to naive UTC just for this last step. get_start and get_end
+            # already return UTC, so dropping tzinfo is enough.
+            start = start.replace(tzinfo=None)
+            end = end.replace(tzinfo=None)
             try:
                 self.usage_list = self.get_usage_list(start, end)
             except Exception:
@@ -207,10 +371,13 @@ class BaseUsage(object):
         for project_usage in self.usage_list:
             project_summary = project_usage.get_summary()
             for key, value in project_summary.items():
-                self.summary.setdefault(key, 0)
-                self.summary[key] += value
+                self.summary[key] = self.summary.get(key, 0) + value
 
     def get_quotas(self):
+        if self._quotas_loaded:
+            return
+        self._quotas_loaded = True
+
         try:
             self.quotas = quotas.tenant_quota_usages(self.request)
         except Exception:
@@ -218,21 +385,17 @@ class BaseUsage(object):
                               _("Unable to retrieve quota information."))
 
     def csv_link(self):
-        form = self.get_form()
-        data = {}
-        if hasattr(form, "cleaned_data"):
-            data = form.cleaned_data
-        if not ('start' in data and 'end' in data):
-            data = {"start": self.today.date(), "end": self.today.date()}
-        return "?start=%s&end=%s&format=csv" % (data['start'],
-                                                data['end'])
+        start, end = self.get_date_range()
+        return "?start=%s&end=%s&format=csv" % (start.date(), end.date())
 
 
 class GlobalUsage(BaseUsage):
     show_terminated = True
 
     def get_usage_list(self, start, end):
-        return api.nova.usage_list(self.request, start, end)
+        return _cached_nova_usages(
+            self._usage_cache_key(start, end),
+            lambda: api.nova.usage_list(self.request, start, end))
 
 
 class ProjectUsage(BaseUsage):
@@ -242,23 +405,24 @@ class ProjectUsage(BaseUsage):
     def get_usage_list(self, start, end):
         show_terminated = self.request.GET.get('show_terminated',
                                                self.show_terminated)
-        instances = []
-        terminated_instances = []
-        usage = api.nova.usage_get(self.request, self.project_id, start, end)
+        usage = _cached_nova_usages(
+            self._usage_cache_key(start, end),
+            lambda: [api.nova.usage_get(self.request, self.project_id,
+                                        start, end)])[0]
         # Attribute may not exist if there are no instances
-        if hasattr(usage, 'server_usages'):
-            now = self.today
-            for server_usage in usage.server_usages:
-                # This is a way to phrase uptime in a way that is compatible
-                # with the 'timesince' filter. (Use of local time intentional.)
-                server_uptime = server_usage['uptime']
-                total_uptime = now - datetime.timedelta(seconds=server_uptime)
-                server_usage['uptime_at'] = total_uptime
-                if server_usage['ended_at'] and not show_terminated:
-                    terminated_instances.append(server_usage)
-                else:
-                    instances.append(server_usage)
-        usage.server_usages = instances
+        server_usages = getattr(usage, 'server_usages', None) or []
+        if not show_terminated:
+            # Terminated instances are dropped, so skip their uptime too.
+            server_usages = [server_usage for server_usage in server_usages
+                             if not server_usage['ended_at']]
+        now = self.today
+        timedelta = datetime.timedelta
+        for server_usage in server_usages:
+            # This is a way to phrase uptime in a way that is compatible
+            # with the 'timesince' filter. (Use of local time intentional.)
+            server_usage['uptime_at'] = now - timedelta(
+                seconds=server_usage['uptime'])
+        usage.server_usages = server_usages
         return (usage,)
 
 
@@ -275,33 +439,25 @@ class CsvDataMixin(object):
     def __init__(self):
         self.out = StringIO()
         super(CsvDataMixin, self).__init__()
-        if hasattr(self, "columns"):
-            self.writer = DictWriter(self.out, map(self.encode, self.columns))
-            self.is_dict = True
-        else:
-            self.writer = writer(self.out)
-            self.is_dict = False
+        self.writer = writer(self.out)
 
     def write_csv_header(self):
-        if self.is_dict:
-            try:
-                self.writer.writeheader()
-            except AttributeError:
-                # For Python<2.7
-                self.writer.writerow(dict(zip(
-                                          self.writer.fieldnames,
-                                          self.writer.fieldnames)))
+        if hasattr(self, "columns"):
+            self.writer.writerow([self.encode(col) for col in self.columns])
 
     def write_csv_row(self, args):
-        if self.is_dict:
-            self.writer.writerow(dict(zip(
-                self.writer.fieldnames, map(self.encode, args))))
-        else:
-            self.writer.writerow(map(self.encode, args))
+        encode = self.encode
+        self.writer.writerow([encode(arg) for arg in args])
 
     def encode(self, value):
         # csv and StringIO cannot work with mixed encodings,
         # so encode all with utf-8
+        if isinstance(value, str):
+            return value
+        if isinstance(value, unicode):
+            return value.encode('utf-8')
+        if isinstance(value, (int, long, float)):
+            return str(value)
         return unicode(value).encode('utf-8')
 
 
@@ -310,6 +466,9 @@ class BaseCsvResponse(CsvDataMixin, HttpResponse):
     """
     Base CSV response class. Provides handling of CSV data.
 
+    The whole export is built in memory before it is returned. It is kept
+    as the fallback for Django < 1.5; use ``BaseCsvStreamingResponse``,
+    which is an alias of this class on those versions, instead.
     """
 
     def __init__(self, request, template, context, content_type, **kwargs):
@@ -341,9 +500,7 @@ class BaseCsvResponse(CsvDataMixin, HttpResponse):
         raise NotImplementedError("You must define a get_row_data method on %s"
                                   % self.__class__.__name__)
 
-if VERSION >= (1, 5, 0):
-
-    from django.http import StreamingHttpResponse  # noqa
+if HAS_STREAMING:
 
     class BaseCsvStreamingResponse(CsvDataMixin, StreamingHttpResponse):
 
@@ -364,26 +521,43 @@ if VERSION >= (1, 5, 0):
                 context = django_template.RequestContext(request, self.context)
                 self.header = header_template.render(context)
 
+            # The content is generated after the locale middleware has
+            # deactivated the request's language, so keep it for later.
+            self.language = translation.get_language()
             self._closable_objects.append(self.out)
 
             self.streaming_content = self.get_content()
 
         def buffer(self):
             buf = self.out.getvalue()
-            self.out.truncate(0)
+            # Rewind before truncating so the next write starts at the
+            # beginning of the reused buffer.
+            self.out.seek(0)
+            self.out.truncate()
             return buf
 
         def get_content(self):
-            if self.header:
-                self.out.write(self.encode(self.header))
-
-            self.write_csv_header()
+            # The language is only activated while a chunk is built, so it
+            # doesn't leak into the server code consuming the response.
+            with translation.override(self.language):
+                if self.header:
+                    self.out.write(self.encode(self.header))
+                self.write_csv_header()
+                rows = self.get_row_data()
             yield self.buffer()
 
-            for row in self.get_row_data():
-                self.write_csv_row(row)
+            while True:
+                with translation.override(self.language):
+                    row = next(rows, None)
+                    if row is None:
+                        break
+                    self.write_csv_row(row)
                 yield self.buffer()
 
         def get_row_data(self):
             raise NotImplementedError("You must define a get_row_data method "
                                       "on %s" % self.__class__.__name__)
+
+else:
+    # Streaming responses need Django 1.5, so buffer the export instead.
+    BaseCsvStreamingResponse = BaseCsvResponse